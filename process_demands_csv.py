@@ -1,13 +1,13 @@
+import gc
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from rich.console import Console
 from rich.table import Table
 import logging
 import plotly.express as px
-import os
 
 # Configuração de logging
 logging.basicConfig(
@@ -19,6 +19,24 @@ logger = logging.getLogger(__name__)
 # Console para output formatado
 console = Console()
 
+# Diretório de saída dos gráficos
+REPORTS_DIR = Path('reports')
+
+# Tabela de remoção de acentos usada na normalização de nomes
+_ACCENT_TABLE = str.maketrans(
+    'ÁÀÃÂÄÉÈÊËÍÌÎÏÓÒÕÔÖÚÙÛÜÇÑáàãâäéèêëíìîïóòõôöúùûüçñ',
+    'AAAAAEEEEIIIIOOOOOUUUUCNaaaaaeeeeiiiiooooouuuucn'
+)
+
+# Colunas sem nome geradas pelo pandas ou apenas com espaços
+UNNAMED_COLUMN_PATTERN = r'^(Unnamed:|\s*$)'
+
+# Equipes na ordem dos códigos atribuídos em calculate_totals
+EQUIPES = ['Sem Responsável', 'Equipe Júlio', 'Equipe Leandro e Adriano', 'Outros']
+
+# Colunas de baixa cardinalidade armazenadas como categóricas
+CATEGORY_COLUMNS = ['RESPONSÁVEL', 'SITUAÇÃO', 'EQUIPE', 'BANCO', 'DIRETOR']
+
 class DemandasProcessor:
     def __init__(self):
         self.docs_path = Path('f:/demandstest/organized_project/docs')
@@ -52,17 +70,23 @@ class DemandasProcessor:
         if pd.isna(name):
             return name
         # Remove acentos e converte para maiúsculas
-        name = unicodedata.normalize('NFKD', str(name).strip().upper())
-        name = name.encode('ASCII', 'ignore').decode('ASCII')
-        return name
+        return str(name).translate(_ACCENT_TABLE).strip().upper()
 
     def read_csv_files(self):
         """Lê os arquivos CSV e armazena em DataFrames."""
         try:
-            # Lendo os arquivos CSV
-            self.df_julio = pd.read_csv(self.docs_path / '_DEMANDAS DE JANEIRO_2025 - DEMANDAS JULIO.csv')
-            self.df_leandro = pd.read_csv(self.docs_path / '_DEMANDAS DE JANEIRO_2025 - DEMANDA LEANDROADRIANO.csv')
-            self.df_quitados = pd.read_csv(self.docs_path / '_DEMANDAS DE JANEIRO_2025 - QUITADOS.csv')
+            # Lendo os arquivos CSV em paralelo
+            paths = {
+                'julio': self.docs_path / '_DEMANDAS DE JANEIRO_2025 - DEMANDAS JULIO.csv',
+                'leandro': self.docs_path / '_DEMANDAS DE JANEIRO_2025 - DEMANDA LEANDROADRIANO.csv',
+                'quitados': self.docs_path / '_DEMANDAS DE JANEIRO_2025 - QUITADOS.csv'
+            }
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                futures = {key: executor.submit(pd.read_csv, path) for key, path in paths.items()}
+            
+            self.df_julio = futures['julio'].result()
+            self.df_leandro = futures['leandro'].result()
+            self.df_quitados = futures['quitados'].result()
             
             logger.info("Arquivos CSV carregados com sucesso")
             
@@ -105,10 +129,8 @@ class DemandasProcessor:
                 logger.info(f"Processando DataFrame {df_name}")
                 
                 # Removendo colunas vazias ou desnecessárias
-                df.drop(columns=[col for col in df.columns if 
-                               col.startswith('Unnamed:') or 
-                               col.strip() == ''], 
-                       inplace=True, errors='ignore')
+                unnamed = df.columns.str.match(UNNAMED_COLUMN_PATTERN)
+                df.drop(columns=df.columns[unnamed], inplace=True, errors='ignore')
                 
                 # Renomeando colunas para o padrão
                 df.rename(columns=column_mapping, inplace=True)
@@ -121,11 +143,15 @@ class DemandasProcessor:
                 
                 # Normalizando nomes dos responsáveis
                 if 'RESPONSÁVEL' in df.columns:
-                    df['RESPONSÁVEL'] = df['RESPONSÁVEL'].apply(self.normalize_name)
+                    responsavel = df['RESPONSÁVEL'].astype('category')
+                    categories = responsavel.cat.categories
+                    df['RESPONSÁVEL'] = responsavel.map(dict(zip(categories, map(self.normalize_name, categories))))
                 
-                # Padronizando valores da coluna SITUAÇÃO
+                # Padronizando valores da coluna SITUAÇÃO sobre as categorias únicas
                 if 'SITUAÇÃO' in df.columns:
-                    df['SITUAÇÃO'] = df['SITUAÇÃO'].str.upper().str.strip()
+                    situacao = df['SITUAÇÃO'].astype('category')
+                    categories = situacao.cat.categories
+                    df['SITUAÇÃO'] = situacao.map(dict(zip(categories, categories.str.upper().str.strip())))
                 
                 # Adicionando colunas faltantes com valores NA
                 for col in columns_to_keep:
@@ -136,6 +162,9 @@ class DemandasProcessor:
                 df_columns = [col for col in columns_to_keep if col in df.columns]
                 df = df[df_columns]
                 
+                # Convertendo colunas de baixa cardinalidade para categóricas
+                df = self._to_category(df)
+                
                 # Atualizando o DataFrame original
                 if df_name == 'JULIO':
                     self.df_julio = df
@@ -154,32 +183,58 @@ class DemandasProcessor:
 
         logger.info("Pré-processamento dos dados concluído")
 
+    def _to_category(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte as colunas de baixa cardinalidade para o tipo category."""
+        return df.astype({
+            col: 'category' for col in CATEGORY_COLUMNS
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        })
+
     def calculate_totals(self):
         """Calcula totais por responsável e equipe."""
         # Combinando os DataFrames
         dfs_to_combine = [df for df in [self.df_julio, self.df_leandro] if df is not None]
         if dfs_to_combine:
-            self.df_combined = pd.concat(dfs_to_combine, ignore_index=True)
+            # Colunas inteiramente vazias (preenchidas em preprocess_data) ficam fora do concat,
+            # que as completa com nulos sem o aviso de dtypes; o reindex restaura a ordem das colunas
+            columns = dfs_to_combine[0].columns
+            self.df_combined = pd.concat(
+                [df.dropna(axis=1, how='all') for df in dfs_to_combine], ignore_index=True
+            ).reindex(columns=columns, fill_value=pd.NA)
+            
+            # Liberando os DataFrames originais, já contidos em df_combined
+            self.df_julio = None
+            self.df_leandro = None
+            del dfs_to_combine
+            gc.collect()
             
-            # Função para classificar equipe
-            def get_team(resp):
-                if pd.isna(resp):
-                    return "Sem Responsável"
-                resp = self.normalize_name(resp)
-                if resp in self.equipe_julio:
-                    return "Equipe Júlio"
-                elif resp in self.equipe_leandro_adriano:
-                    return "Equipe Leandro e Adriano"
-                return "Outros"
+            # Categorias diferentes entre os DataFrames viram object no concat
+            self.df_combined = self._to_category(self.df_combined)
             
-            # Adicionando coluna de equipe
-            self.df_combined['EQUIPE'] = self.df_combined['RESPONSÁVEL'].apply(get_team)
+            # Adicionando coluna de equipe (responsáveis já normalizados no pré-processamento)
+            responsavel = self.df_combined['RESPONSÁVEL']
+            team_codes = np.select(
+                [
+                    responsavel.isna(),
+                    responsavel.isin(self.equipe_julio),
+                    responsavel.isin(self.equipe_leandro_adriano),
+                ],
+                [0, 1, 2],
+                default=3
+            ).astype(np.int8)
+            self.df_combined['EQUIPE'] = pd.Categorical.from_codes(team_codes, categories=EQUIPES)
+            
+            # Contagem única por equipe, responsável e situação
+            counts = self.df_combined.groupby(
+                ['EQUIPE', 'RESPONSÁVEL', 'SITUAÇÃO'], observed=True, dropna=False
+            ).size()
+            counts = counts[counts.index.get_level_values('SITUAÇÃO').notna()]
             
             # Calculando totais por responsável
-            resp_totals = self.df_combined.groupby('RESPONSÁVEL')['SITUAÇÃO'].value_counts().unstack(fill_value=0)
+            resp_totals = counts.groupby(level=['RESPONSÁVEL', 'SITUAÇÃO'], observed=True).sum().unstack(fill_value=0)
             
             # Calculando totais por equipe
-            team_totals = self.df_combined.groupby('EQUIPE')['SITUAÇÃO'].value_counts().unstack(fill_value=0)
+            team_totals = counts.groupby(level=['EQUIPE', 'SITUAÇÃO'], observed=True).sum().unstack(fill_value=0)
             
             # Exibindo resultados
             self._display_totals("Totais por Responsável", resp_totals)
@@ -200,34 +255,42 @@ class DemandasProcessor:
             table.add_column(status, justify="right")
         
         # Adicionando linhas
-        for idx in df.index:
-            row = [str(idx)] + [str(df.loc[idx, col]) for col in df.columns]
-            table.add_row(*row)
+        for row in df.itertuples(index=True, name=None):
+            table.add_row(*[str(value) for value in row])
         
         console.print(table)
 
     def _generate_plots(self):
         """Gera visualizações dos dados."""
-        if not os.path.exists('reports'):
-            os.makedirs('reports')
-            
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # Pré-agregando as contagens para não serializar todas as linhas no HTML
+        team_status = (
+            self.df_combined.groupby(['EQUIPE', 'SITUAÇÃO'], observed=True)
+            .size()
+            .reset_index(name='COUNT')
+        )
+        team_counts = self.df_combined['EQUIPE'].value_counts().reset_index()
+        
         # Gráfico de status por equipe
         fig_team = px.bar(
-            self.df_combined,
+            team_status,
             x='EQUIPE',
+            y='COUNT',
             color='SITUAÇÃO',
             title='Distribuição de Status por Equipe',
             barmode='group'
         )
-        fig_team.write_html('reports/status_por_equipe.html')
+        fig_team.write_html(REPORTS_DIR / 'status_por_equipe.html')
         
         # Gráfico de pizza para distribuição de demandas por equipe
         fig_pie = px.pie(
-            self.df_combined,
+            team_counts,
             names='EQUIPE',
+            values='count',
             title='Distribuição de Demandas por Equipe'
         )
-        fig_pie.write_html('reports/distribuicao_equipes.html')
+        fig_pie.write_html(REPORTS_DIR / 'distribuicao_equipes.html')
         
         logger.info("Gráficos gerados com sucesso")
 
@@ -3,14 +3,55 @@ import numpy as np
 from datetime import datetime, timedelta
 import argparse
 import os
+from pathlib import Path
+
+# Colunas de data presentes nas abas de demandas
+DATE_COLUMNS = ("DATA", "RESOLUÇÃO", "DATA RESOLUÇÃO")
+
+# Tipos inferidos de colunas object que o Parquet não grava sem alterar (ex.: textos e números juntos)
+MIXED_OBJECT_TYPES = ("mixed", "mixed-integer")
+
+def is_mixed_column(series):
+    """Indica se a coluna object mistura tipos que não voltariam iguais do parquet."""
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in MIXED_OBJECT_TYPES
+
+def read_sheet_cached(file_path, sheet_name):
+    """Lê uma aba do Excel usando um cache parquet ao lado do arquivo original."""
+    excel_path = Path(file_path)
+    cache_path = excel_path.with_name(f"{excel_path.stem}.{sheet_name}.parquet")
+    
+    if cache_path.exists() and cache_path.stat().st_mtime >= excel_path.stat().st_mtime:
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            print(f"Não foi possível ler o cache {cache_path}: {str(e)}")
+    
+    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    
+    # Colunas mistas viram texto, na leitura direta e no cache; as de data são convertidas depois em load_data
+    for col in df.columns:
+        if col not in DATE_COLUMNS and is_mixed_column(df[col]):
+            df[col] = df[col].astype("string")
+    
+    # Datas misturadas com números (ex.: 6620035) voltariam do parquet como datas; aba lida sem cache
+    if any(is_mixed_column(df[col]) for col in df.columns):
+        return df
+    
+    try:
+        df.to_parquet(cache_path)
+    except Exception as e:
+        cache_path.unlink(missing_ok=True)
+        print(f"Não foi possível gravar o cache {cache_path}: {str(e)}")
+    
+    return df
 
 def load_data(file_path, sheet_name="DEMANDAS JULIO"):
     """Carrega os dados do arquivo Excel."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
     
-    # Carregar a aba específica
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    # Carregar a aba específica, reutilizando o cache parquet se estiver atualizado
+    df = read_sheet_cached(file_path, sheet_name)
     
     print(f"\nColunas encontradas na aba {sheet_name}:")
     for i, col in enumerate(df.columns):
@@ -19,14 +60,11 @@ def load_data(file_path, sheet_name="DEMANDAS JULIO"):
     print("\nPrimeiras 5 linhas do DataFrame:")
     print(df.head())
     
-    # Tentar converter colunas de data
-    for col in df.columns:
-        if "DATA" in str(col).upper():
-            try:
-                df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce')
-                print(f"\nColuna {col} convertida para datetime")
-            except:
-                print(f"Não foi possível converter a coluna {col} para datetime")
+    # Converter colunas de data conhecidas
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce', cache=True)
+            print(f"\nColuna {col} convertida para datetime")
     
     return df
 
@@ -67,17 +105,11 @@ def count_resolutions_by_person(df, date):
         
         print(f"Usando coluna de responsável: {resp_col}")
         
-        # Contar resoluções
-        resolutions = daily_data[resp_col].value_counts()
-        
-        # Converter para dicionário
-        results = {}
-        for name, count in resolutions.items():
-            clean_name = str(name).strip()
-            if clean_name and clean_name.lower() != "nan":
-                results[clean_name] = count
+        # Limpar nomes vazios/"nan" antes de contar resoluções
+        cleaned = daily_data[resp_col].dropna().astype("string").str.strip()
+        cleaned = cleaned[(cleaned.str.len() > 0) & (cleaned.str.lower() != "nan")]
         
-        return results
+        return cleaned.value_counts().to_dict()
     except Exception as e:
         print(f"Erro ao contar resoluções: {str(e)}")
         return {}
@@ -1,28 +1,187 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from datetime import datetime, timedelta
 import argparse
+import hashlib
+import json
 import os
-import warnings
-import re
-
-def capture_excel_warnings():
-    """Captura warnings do Excel e retorna informações sobre células com erro."""
-    cell_errors = []
-    
-    def warning_handler(message, category, filename, lineno, file=None, line=None):
-        if category == UserWarning and "is marked as a date but the serial value" in str(message):
-            # Extrair informações do warning
-            match = re.search(r"Cell ([A-Z]+\d+).*serial value (\d+\.\d+)", str(message))
-            if match:
-                cell_ref, serial_value = match.groups()
-                cell_errors.append({
-                    'cell': cell_ref,
-                    'value': float(serial_value)
-                })
-    
-    warnings.showwarning = warning_handler
-    return cell_errors
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Diretório do cache das abas já processadas
+CACHE_DIR = Path.home() / ".cache" / "demand_analysis"
+
+# Versão do formato do cache; incrementar quando o processamento das abas mudar
+CACHE_VERSION = 7
+
+# Tipos inferidos de colunas object que o Arrow não consegue gravar (ex.: textos e números juntos)
+MIXED_OBJECT_TYPES = ("mixed", "mixed-integer")
+
+# Coluna interna com a data de referência normalizada (sem horário)
+DATE_KEY_COLUMN = "_date_key"
+
+# Coluna interna que marca as linhas com situação de quitado
+QUITADO_FLAG_COLUMN = "_is_quitado"
+
+# Colunas de status e responsáveis armazenadas como category
+CATEGORY_COLUMNS = ("SITUACAO", "RESPONSAVEL", "CONSULTOR", "RESPONSÁVEL")
+
+# Balde de cada situação nas análises diárias por equipe e por colaborador
+STATUS_TO_BUCKET = {
+    "RESOLVIDO": "Resolvidos", "QUITADO": "Resolvidos",
+    "PENDENTE": "Pendentes", "EM ANDAMENTO": "Pendentes",
+    "ANALISE": "Analise", "EM ANÁLISE": "Analise",
+    "APROVADO": "Aprovados"
+}
+
+# Balde de cada situação no DataFrame consolidado (quitados e aprovados separados)
+CONSOLIDATED_STATUS_TO_BUCKET = {
+    "RESOLVIDO": "Resolvidos",
+    "PENDENTE": "Pendentes", "EM ANDAMENTO": "Pendentes",
+    "ANALISE": "Analisados", "EM ANÁLISE": "Analisados",
+    "QUITADO": "Quitados",
+    "APROVADO": "Aprovados"
+}
+
+# Acima desta cardinalidade a coluna não é tratada como status
+MAX_STATUS_CARDINALITY = 1000
+
+# Métricas por colaborador gravadas em metricas_colaboradores.csv
+CONSOLIDATED_METRICS = ['Resolvidos', 'Pendentes', 'Analisados', 'Quitados', 'Aprovados']
+
+# Esquema fixo do CSV de métricas, gravado incrementalmente data a data
+METRICS_CSV_SCHEMA = pa.schema(
+    [pa.field('Data', pa.date32()), pa.field('Nome', pa.string()), pa.field('Equipe', pa.string())]
+    + [pa.field(metric, pa.int64()) for metric in CONSOLIDATED_METRICS]
+)
+
+# Maior serial de data aceito pelo Excel (31/12/9999)
+EXCEL_MAX_DATE_SERIAL = 2958465
+
+def find_invalid_serial_dates(sheet, col, serial_values):
+    """Retorna os erros das células de data com seriais fora dos limites do Excel."""
+    return [
+        {
+            'sheet': sheet,
+            'column': col,
+            'row': int(idx) + 2,
+            'value': float(value)
+        }
+        for idx, value in serial_values.items()
+    ]
+
+def workbook_cache_key(file_path):
+    """Gera a chave de cache: o hash do caminho seguido do hash da data de modificação e do tamanho do arquivo."""
+    stat = os.stat(file_path)
+    path_hash = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=8).hexdigest()
+    identity = f"{CACHE_VERSION}:{stat.st_mtime_ns}:{stat.st_size}"
+    return f"{path_hash}-{hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()}"
+
+def is_mixed_column(series):
+    """Indica se a coluna object mistura tipos que não voltariam iguais do Feather."""
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in MIXED_OBJECT_TYPES
+
+def write_atomically(path, write):
+    """Grava o arquivo em um caminho temporário e o renomeia ao final, para nunca deixar um arquivo parcial."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def quitado_flag(situacao):
+    """Marca as linhas cuja situação contém "QUITADO", comparando apenas os códigos das categorias."""
+    situacao = situacao.astype("category")
+    quitado_codes = [
+        code for code, category in enumerate(situacao.cat.categories)
+        if isinstance(category, str) and "QUITADO" in category.upper()
+    ]
+    return situacao.cat.codes.isin(quitado_codes).to_numpy()
+
+def column_roles(df):
+    """Identifica uma única vez as colunas de data, de status e de responsável, guardando-as em df.attrs."""
+    if "date_cols" not in df.attrs:
+        df.attrs["date_cols"] = tuple(
+            col for col in df.columns if "DATA" in str(col).upper() or "RESOLUCAO" in str(col).upper()
+        )
+        df.attrs["status_cols"] = tuple(
+            col for col in df.columns if "STATUS" in str(col).upper() or "SITUACAO" in str(col).upper()
+        )
+        df.attrs["resp_col"] = next(
+            (col for col in ['RESPONSAVEL', 'CONSULTOR', 'RESPONSÁVEL'] if col in df.columns), None
+        )
+    return df.attrs
+
+def load_cached_data(cache_key, sheet_names):
+    """Carrega do cache as abas disponíveis e os erros de célula de cada uma."""
+    dfs, sheet_errors = {}, {}
+    for sheet in sheet_names:
+        sheet_path = CACHE_DIR / f"{cache_key}_{sheet}.feather"
+        errors_path = CACHE_DIR / f"{cache_key}_{sheet}_cell_errors.json"
+        if not sheet_path.exists() or not errors_path.exists():
+            continue
+        
+        try:
+            df = pd.read_feather(sheet_path)
+            with open(errors_path, encoding="utf-8") as f:
+                sheet_errors[sheet] = json.load(f)
+        except Exception as e:
+            print(f"Aviso ao ler cache da aba {sheet}: {str(e)}")
+            continue
+        
+        column_roles(df)
+        dfs[sheet] = df
+        print(f"\nCarregados {len(df)} registros da aba {sheet} (cache)")
+    
+    return dfs, sheet_errors
+
+def save_cached_data(cache_key, dfs, sheet_errors):
+    """Grava cada aba em Feather e seus erros de célula em JSON, removendo os caches de versões anteriores do arquivo."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for sheet, df in dfs.items():
+        # Abas com tipos misturados (ex.: datas e números preservados) mudariam no Feather; relidas a cada execução
+        if any(is_mixed_column(df[col]) for col in df.columns):
+            continue
+        
+        try:
+            write_atomically(
+                CACHE_DIR / f"{cache_key}_{sheet}.feather",
+                lambda path: df.to_feather(path, compression="zstd")
+            )
+            # Os erros são gravados por último e marcam a aba como completa no cache
+            write_atomically(
+                CACHE_DIR / f"{cache_key}_{sheet}_cell_errors.json",
+                lambda path: path.write_text(json.dumps(sheet_errors.get(sheet, [])), encoding="utf-8")
+            )
+        except Exception as e:
+            print(f"Aviso ao gravar cache da aba {sheet}: {str(e)}")
+    
+    # Manter apenas o cache da versão atual deste arquivo
+    path_hash = cache_key.split("-")[0]
+    for old_path in CACHE_DIR.glob(f"{path_hash}-*"):
+        if not old_path.name.startswith(f"{cache_key}_"):
+            old_path.unlink(missing_ok=True)
+
+def csv_table(df):
+    """Converte o DataFrame em tabela Arrow sem colunas dictionary, que o escritor CSV não aceita."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.cast(pa.schema([
+        pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+        for field in table.schema
+    ]))
+
+def write_csv(df, output_file):
+    """Escreve o DataFrame em CSV UTF-8 com BOM usando o escritor do pyarrow."""
+    table = csv_table(df)
+    
+    with open(output_file, 'wb') as f:
+        f.write(b'\xef\xbb\xbf')
+        pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=True))
 
 def normalize_column_name(col):
     """Normaliza o nome da coluna para evitar problemas de codificação."""
@@ -43,41 +202,76 @@ def load_data(file_path, sheet_names=None):
     if sheet_names is None:
         sheet_names = ["DEMANDAS JULIO", "DEMANDA LEANDROADRIANO", "QUITADOS"]
     
-    # Configurar captura de warnings
-    cell_errors = capture_excel_warnings()
+    # Reutilizar as abas já processadas se o arquivo não mudou
+    cache_key = workbook_cache_key(file_path)
+    cached_dfs, sheet_errors = load_cached_data(cache_key, sheet_names)
+    missing_sheets = [sheet for sheet in sheet_names if sheet not in cached_dfs]
     
     # Valores que não devem ser convertidos para data
     non_date_values = {6620035.0}  # Adicionar outros valores conforme necessário
     
+    # Ler as abas em paralelo com o leitor calamine (Rust), que libera o GIL durante o parsing
+    executor = ThreadPoolExecutor(max_workers=max(len(missing_sheets), 1))
+    futures = {
+        sheet: executor.submit(pd.read_excel, file_path, sheet_name=sheet, engine="calamine")
+        for sheet in missing_sheets
+    }
+    
     dfs = {}
-    for sheet in sheet_names:
+    for sheet in missing_sheets:
+        cell_errors = sheet_errors[sheet] = []
         try:
-            # Carregar o Excel
-            df = pd.read_excel(file_path, sheet_name=sheet)
+            # Aguardar a leitura da aba
+            df = futures[sheet].result()
             
             # Normalizar nomes das colunas
             df.columns = [normalize_column_name(col) if isinstance(col, str) else col for col in df.columns]
             
             # Identificar colunas de data
-            date_columns = [col for col in df.columns if "DATA" in str(col).upper() or "RESOLUCAO" in str(col).upper()]
+            date_columns = column_roles(df)["date_cols"]
             
             for col in date_columns:
                 try:
-                    # Identificar valores que são números grandes (não datas)
-                    numeric_mask = pd.to_numeric(df[col], errors='coerce').isin(non_date_values)
+                    # Colunas lidas como datetime não precisam de conversão
+                    if pd.api.types.is_datetime64_any_dtype(df[col]):
+                        continue
+                    
+                    serial_values = pd.to_numeric(df[col], errors='coerce')
+                    
+                    # Seriais de data fora dos limites do Excel permanecem numéricos no calamine;
+                    # os números conhecidos que não são datas seguem para o tratamento abaixo
+                    invalid_serial_mask = (
+                        (serial_values > EXCEL_MAX_DATE_SERIAL) & ~serial_values.isin(non_date_values)
+                    )
+                    if invalid_serial_mask.any():
+                        cell_errors.extend(find_invalid_serial_dates(sheet, col, serial_values[invalid_serial_mask]))
+                        # Tratar como célula com erro, assim como o openpyxl fazia
+                        df[col] = df[col].mask(invalid_serial_mask)
                     
-                    # Manter os valores originais para os números grandes
-                    original_values = df[col].copy()
+                    # Identificar valores que são números grandes (não datas)
+                    numeric_mask = serial_values.isin(non_date_values) & ~invalid_serial_mask
                     
-                    # Tentar converter para datetime
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
+                    if not numeric_mask.any():
+                        df[col] = pd.to_datetime(df[col], errors='coerce')
+                        continue
                     
-                    # Restaurar os valores originais onde eram números grandes
-                    df.loc[numeric_mask, col] = original_values[numeric_mask]
+                    # Converter o restante, mantendo os valores originais onde eram números grandes
+                    converted = pd.to_datetime(df[col].mask(numeric_mask), errors='coerce')
+                    df[col] = converted.astype(object).where(~numeric_mask, df[col])
                     
                 except Exception as e:
                     print(f"Aviso ao processar coluna {col}: {str(e)}")
             
+            # Demais colunas com tipos misturados (ex.: textos e números) viram texto, para caberem no cache
+            for col in df.columns:
+                if col not in date_columns and is_mixed_column(df[col]):
+                    df[col] = df[col].astype("string")
+            
+            # Colunas de baixa cardinalidade como category (códigos inteiros em vez de strings)
+            for col in CATEGORY_COLUMNS:
+                if col in df.columns:
+                    df[col] = df[col].astype("category")
+            
             dfs[sheet] = df
             print(f"\nCarregados {len(df)} registros da aba {sheet}")
             print(f"Colunas encontradas: {', '.join(df.columns)}")
@@ -89,10 +283,28 @@ def load_data(file_path, sheet_names=None):
                     print(f"\nExemplos de valores em {col}:")
                     for val in sample_vals:
                         print(f"  {val} (tipo: {type(val)})")
+            
+            # Pré-calcular a data normalizada usada nos filtros diários
+            date_col = 'RESOLUCAO' if 'RESOLUCAO' in df.columns else 'DATA'
+            if date_col in df.columns:
+                df[DATE_KEY_COLUMN] = pd.to_datetime(df[date_col], errors='coerce').dt.normalize()
+            
+            # Pré-calcular a marcação de quitados a partir dos códigos da categoria
+            if 'SITUACAO' in df.columns:
+                df[QUITADO_FLAG_COLUMN] = quitado_flag(df['SITUACAO'])
                 
         except Exception as e:
             print(f"Erro ao carregar aba {sheet}: {str(e)}")
     
+    executor.shutdown()
+    
+    if dfs:
+        save_cached_data(cache_key, dfs, sheet_errors)
+    
+    # Abas e erros na ordem pedida, juntando as lidas do cache e as processadas agora
+    dfs = {**cached_dfs, **dfs}
+    dfs = {sheet: dfs[sheet] for sheet in sheet_names if sheet in dfs}
+    cell_errors = [error for sheet in sheet_names for error in sheet_errors.get(sheet, [])]
     return dfs, cell_errors
 
 def analyze_data_quality(df):
@@ -105,16 +317,20 @@ def analyze_data_quality(df):
         "unique_values": {}
     }
     
+    # Nulos e cardinalidade de todas as colunas em uma única chamada cada
+    null_counts = df.isnull().sum()
+    cardinality = df.nunique(dropna=True)
+    
     for col in df.columns:
         # Contagem de valores nulos
-        null_count = df[col].isnull().sum()
+        null_count = null_counts[col]
         null_percentage = (null_count / len(df)) * 100
         
         # Tipo de dados
         dtype = str(df[col].dtype)
         
         # Valores únicos
-        unique_count = df[col].nunique()
+        unique_count = cardinality[col]
         
         quality_report["columns"][col] = {
             "null_count": int(null_count),
@@ -122,6 +338,7 @@ def analyze_data_quality(df):
             "dtype": dtype,
             "unique_values": int(unique_count)
         }
+        quality_report["unique_values"][col] = int(unique_count)
         
         # Adicionar aos totais por tipo
         if dtype not in quality_report["data_types"]:
@@ -137,14 +354,22 @@ def analyze_data_quality(df):
     
     return quality_report
 
-def analyze_status_columns(df):
-    """Analisa as colunas de status e situação."""
+def analyze_status_columns(df, cardinality=None):
+    """Analisa as colunas de status e situação; `cardinality` reaproveita os valores únicos já contados neste mesmo df."""
     status_report = {}
     
     # Procurar colunas relacionadas a status
-    status_columns = [col for col in df.columns if "STATUS" in str(col).upper() or "SITUACAO" in str(col).upper()]
+    status_columns = list(column_roles(df)["status_cols"])
+    
+    # Reutilizar a cardinalidade calculada em analyze_data_quality, quando informada
+    if cardinality is None:
+        cardinality = df[status_columns].nunique(dropna=True).to_dict()
     
     for col in status_columns:
+        # Coluna com milhares de valores distintos não é de status
+        if cardinality[col] > MAX_STATUS_CARDINALITY:
+            continue
+        
         status_counts = df[col].value_counts()
         status_report[col] = status_counts.to_dict()
     
@@ -155,13 +380,16 @@ def analyze_quitados_Janeiro(df):
     if "SITUACAO" not in df.columns or "RESOLUCAO" not in df.columns:
         return None
     
-    # Filtrar registros de Janeiro/2025
-    janeiro_2025 = df[
-        (df["RESOLUCAO"].dt.year == 2025) & 
-        (df["RESOLUCAO"].dt.month == 1)
-    ]
+    # Filtrar registros de Janeiro/2025 comparando o período mensal
+    periodo = df["RESOLUCAO"].dt.to_period("M")
+    janeiro_2025 = df[periodo == pd.Period("2025-01", freq="M")]
     
-    quitados = janeiro_2025[janeiro_2025["SITUACAO"].str.contains("QUITADO", na=False, case=False)]
+    # Usar a marcação de quitados calculada em load_data
+    if QUITADO_FLAG_COLUMN in janeiro_2025.columns:
+        is_quitado = janeiro_2025[QUITADO_FLAG_COLUMN].to_numpy()
+    else:
+        is_quitado = quitado_flag(janeiro_2025["SITUACAO"])
+    quitados = janeiro_2025[is_quitado]
     
     return {
         "total_janeiro": len(janeiro_2025),
@@ -192,91 +420,87 @@ def analyze_formulas_columns(df):
     return analysis
 
 def analyze_date_errors(df, sheet_name, cell_errors):
-    """Analisa erros em datas e retorna um DataFrame com os problemas encontrados."""
+    """Analisa erros em datas e retorna uma lista de dicionários com os problemas encontrados."""
     date_errors = []
     
-    # Adicionar erros capturados dos warnings do Excel
+    # Células (linha, coluna) já reportadas, para evitar duplicidades
+    seen = set()
+    
+    # Adicionar erros de seriais inválidos encontrados na carga do Excel
     for error in cell_errors:
-        # Extrair linha e coluna da referência da célula
-        col_letter = ''.join(filter(str.isalpha, error['cell']))
-        row_num = int(''.join(filter(str.isdigit, error['cell'])))
+        if error.get('sheet', sheet_name) != sheet_name:
+            continue
+        
+        row_num = error['row']
         
         date_errors.append({
             'Sheet': sheet_name,
             'Linha': row_num,
-            'Coluna': 'RESOLUCAO' if col_letter == 'B' else 'DATA',  # Assumindo que coluna B é RESOLUCAO
+            'Coluna': error['column'],
             'Valor_Original': str(error['value']),
             'Erro': 'Valor de data fora dos limites do Excel',
             'Sugestao_Correcao': 'Verificar e corrigir o formato da data'
         })
+        seen.add((row_num, error['column']))
     
     # Identificar colunas de data
-    date_columns = [col for col in df.columns if "DATA" in str(col).upper() or "RESOLUCAO" in str(col).upper()]
+    date_columns = column_roles(df)["date_cols"]
+    
+    # Definir limites razoáveis (ex: entre 2020 e 2025)
+    min_date = pd.Timestamp('2020-01-01')
+    max_date = pd.Timestamp('2025-12-31')
+    
+    # Tipos de erro na ordem de prioridade: (código, erro, sugestão)
+    error_kinds = [
+        (1, 'Valor numérico fora dos limites para data do Excel',
+         'Verificar se o valor está correto e converter para formato de data válido'),
+        (2, 'Data inválida', 'Verificar formato da data'),
+        (3, 'Data fora dos limites', f'Data deve estar entre {min_date.date()} e {max_date.date()}'),
+    ]
     
     for col in date_columns:
-        # Converter para datetime preservando os erros
-        original_values = df[col].copy()
         try:
-            # Verificar valores numéricos muito grandes (erro comum no Excel)
-            if pd.api.types.is_numeric_dtype(df[col]):
-                large_values_mask = df[col] > 50000  # Valores muito grandes para datas do Excel
-                for idx in df[large_values_mask].index:
-                    # Verificar se já não foi reportado pelos warnings
-                    if not any(e['Linha'] == idx + 2 and e['Coluna'] == col for e in date_errors):
-                        date_errors.append({
-                            'Sheet': sheet_name,
-                            'Linha': idx + 2,
-                            'Coluna': col,
-                            'Valor_Original': str(df.loc[idx, col]),
-                            'Erro': 'Valor numérico fora dos limites para data do Excel',
-                            'Sugestao_Correcao': 'Verificar se o valor está correto e converter para formato de data válido'
-                        })
-            
-            converted_dates = pd.to_datetime(df[col], errors='coerce')
-            
-            # Identificar linhas com problemas de conversão
-            problem_mask = pd.isna(converted_dates) & df[col].notna()
-            if problem_mask.any():
-                problem_rows = df[problem_mask]
-                for idx, row in problem_rows.iterrows():
-                    # Verificar se já não foi reportado
-                    if not any(e['Linha'] == idx + 2 and e['Coluna'] == col for e in date_errors):
-                        date_errors.append({
-                            'Sheet': sheet_name,
-                            'Linha': idx + 2,
-                            'Coluna': col,
-                            'Valor_Original': str(row[col]),
-                            'Erro': 'Data inválida',
-                            'Sugestao_Correcao': 'Verificar formato da data'
-                        })
-            
-            # Verificar datas fora dos limites razoáveis
-            valid_dates_mask = converted_dates.notna()
-            valid_dates = converted_dates[valid_dates_mask]
-            
-            # Definir limites razoáveis (ex: entre 2020 e 2025)
-            min_date = pd.Timestamp('2020-01-01')
-            max_date = pd.Timestamp('2025-12-31')
+            values = df[col]
+            converted_dates = pd.to_datetime(values, errors='coerce')
+            parsed = converted_dates.notna().to_numpy()
             
-            out_of_bounds_mask = (valid_dates < min_date) | (valid_dates > max_date)
-            if out_of_bounds_mask.any():
-                problem_dates = valid_dates[out_of_bounds_mask]
-                for idx, date in problem_dates.items():
-                    # Verificar se já não foi reportado
-                    if not any(e['Linha'] == idx + 2 and e['Coluna'] == col for e in date_errors):
+            # Valores numéricos muito grandes (erro comum no Excel)
+            if pd.api.types.is_numeric_dtype(values):
+                too_large = (values > 50000).to_numpy()
+            else:
+                too_large = np.zeros(len(values), dtype=bool)
+            
+            # Linhas com problemas de conversão
+            unparseable = ~parsed & values.notna().to_numpy()
+            
+            # Datas fora dos limites com os kernels de comparação do Arrow (nulos contam como dentro)
+            date_values = pa.array(converted_dates)
+            out_of_bounds = pc.or_(
+                pc.less(date_values, pa.scalar(min_date)),
+                pc.greater(date_values, pa.scalar(max_date))
+            ).fill_null(False).to_numpy(zero_copy_only=False)
+            
+            # Classificar cada célula em uma única passada: 0 = ok
+            codes = np.select([too_large, unparseable, out_of_bounds], [1, 2, 3], default=0)
+            
+            for code, erro, sugestao in error_kinds:
+                for idx in df.index[np.flatnonzero(codes == code)]:
+                    # Verificar se já não foi reportado na carga do Excel
+                    if (idx + 2, col) not in seen:
+                        seen.add((idx + 2, col))
                         date_errors.append({
                             'Sheet': sheet_name,
                             'Linha': idx + 2,
                             'Coluna': col,
-                            'Valor_Original': str(original_values[idx]),
-                            'Erro': 'Data fora dos limites',
-                            'Sugestao_Correcao': f'Data deve estar entre {min_date.date()} e {max_date.date()}'
+                            'Valor_Original': str(df.at[idx, col]),
+                            'Erro': erro,
+                            'Sugestao_Correcao': sugestao
                         })
                     
         except Exception as e:
             print(f"Erro ao processar coluna {col}: {str(e)}")
     
-    return pd.DataFrame(date_errors)
+    return date_errors
 
 def export_date_errors_to_csv(file_path):
     """Exporta erros de data para um arquivo CSV."""
@@ -287,17 +511,15 @@ def export_date_errors_to_csv(file_path):
         # Analisar erros de data em cada planilha
         all_errors = []
         for sheet_name, df in dfs.items():
-            errors_df = analyze_date_errors(df, sheet_name, cell_errors)
-            if not errors_df.empty:
-                all_errors.append(errors_df)
+            all_errors.extend(analyze_date_errors(df, sheet_name, cell_errors))
         
         if all_errors:
-            # Combinar todos os erros
-            combined_errors = pd.concat(all_errors, ignore_index=True)
+            # Montar um único DataFrame com os erros de todas as planilhas
+            combined_errors = pd.DataFrame(all_errors)
             
             # Exportar para CSV
             output_file = 'erros_datas.csv'
-            combined_errors.to_csv(output_file, index=False, encoding='utf-8-sig')
+            write_csv(combined_errors, output_file)
             print(f"\nErros de data exportados para {output_file}")
             print(f"Total de erros encontrados: {len(combined_errors)}")
             
@@ -322,8 +544,11 @@ def generate_quality_report(dfs):
     for sheet_name, df in dfs.items():
         report.append(f"\n=== {sheet_name} ===")
         
+        # Ignorar colunas internas criadas em load_data
+        report_df = df.drop(columns=[DATE_KEY_COLUMN, QUITADO_FLAG_COLUMN], errors='ignore')
+        
         # Análise de qualidade geral
-        quality = analyze_data_quality(df)
+        quality = analyze_data_quality(report_df)
         report.append(f"\nTotal de registros: {quality['total_rows']}")
         
         report.append("\nColunas com dados faltantes:")
@@ -331,7 +556,7 @@ def generate_quality_report(dfs):
             report.append(f"  {col}: {stats['count']} registros ({stats['percentage']:.1f}%)")
         
         # Análise de status
-        status = analyze_status_columns(df)
+        status = analyze_status_columns(report_df, quality["unique_values"])
         if status:
             report.append("\nDistribuição de Status:")
             for col, counts in status.items():
@@ -350,7 +575,7 @@ def generate_quality_report(dfs):
                 report.append(f"  Percentual quitados: {quitados['percentual_quitados']:.1f}%")
         
         # Análise de fórmulas
-        formulas = analyze_formulas_columns(df)
+        formulas = analyze_formulas_columns(report_df)
         if formulas:
             report.append("\nAnálise das Colunas O a S:")
             for col, stats in formulas.items():
@@ -367,6 +592,31 @@ def generate_quality_report(dfs):
     
     return "\n".join(report)
 
+def filter_by_date(df, date):
+    """Filtra as linhas de uma data usando a data normalizada calculada em load_data."""
+    return df[df[DATE_KEY_COLUMN] == date]
+
+def count_status_buckets(df, group_col, status_map, buckets):
+    """
+    Conta, para cada valor de group_col, as situações agrupadas em baldes de status.
+    
+    Args:
+        df: DataFrame com a coluna SITUACAO
+        group_col: Coluna usada para agrupar (ex: responsável)
+        status_map: Dicionário situação -> balde
+        buckets: Baldes retornados como colunas, na ordem desejada
+    
+    Returns:
+        DataFrame indexado por group_col com uma coluna por balde e a coluna Total
+    """
+    bucket = df['SITUACAO'].map(status_map).astype(object).fillna('Outros')
+    counts = df.groupby([df[group_col], bucket], observed=True).size().unstack(fill_value=0)
+    
+    pivot = counts.reindex(columns=buckets, fill_value=0)
+    pivot['Total'] = counts.sum(axis=1)
+    pivot.columns.name = None
+    return pivot
+
 def analyze_daily_by_collaborator(df, date):
     """
     Analisa o desempenho diário de cada colaborador em uma data específica.
@@ -381,66 +631,33 @@ def analyze_daily_by_collaborator(df, date):
     else:
         date = pd.to_datetime(date).normalize()
     
-    # Identificar coluna de data (DATA ou RESOLUCAO)
-    date_col = 'DATA'
-    if 'RESOLUCAO' in df.columns:
-        date_col = 'RESOLUCAO'
-    
     # Filtrar dados pela data
-    df_date = df[pd.to_datetime(df[date_col]).dt.normalize() == date]
+    df_date = filter_by_date(df, date)
     
     if df_date.empty:
         print(f"\nNão há dados para a data {date.strftime('%Y-%m-%d')}.")
         return
     
     # Identificar coluna de responsável
-    resp_col = None
-    for col in ['RESPONSAVEL', 'CONSULTOR', 'RESPONSÁVEL']:
-        if col in df.columns:
-            resp_col = col
-            break
+    resp_col = column_roles(df)["resp_col"]
     
     if not resp_col:
         print("\nNão foi encontrada coluna de responsável nesta planilha.")
         return
     
     # Análise por responsável
-    results = []
-    for resp in df_date[resp_col].unique():
-        if pd.isna(resp):
-            continue
-            
-        df_resp = df_date[df_date[resp_col] == resp]
-        
-        # Contagem de status
-        status_counts = df_resp['SITUACAO'].value_counts()
-        
-        # Identificar os status disponíveis
-        status_map = {
-            'RESOLVIDO': ['RESOLVIDO', 'QUITADO'],
-            'PENDENTE': ['PENDENTE', 'EM ANDAMENTO'],
-            'ANALISE': ['ANALISE', 'EM ANÁLISE']
-        }
-        
-        results.append({
-            'Responsavel': resp,
-            'Resolvidos': sum(status_counts.get(s, 0) for s in status_map['RESOLVIDO']),
-            'Pendentes': sum(status_counts.get(s, 0) for s in status_map['PENDENTE']),
-            'Analise': sum(status_counts.get(s, 0) for s in status_map['ANALISE']),
-            'Total': len(df_resp)
-        })
-    
-    # Converter para DataFrame para melhor visualização
-    results_df = pd.DataFrame(results)
+    results_df = count_status_buckets(df_date, resp_col, STATUS_TO_BUCKET, ['Resolvidos', 'Pendentes', 'Analise'])
+    results_df = results_df.rename_axis('Responsavel').reset_index()
     
     if not results_df.empty:
         print(f"\nAnálise por Colaborador - {date.strftime('%Y-%m-%d')}:")
-        for _, row in results_df.iterrows():
-            print(f"\n{row['Responsavel']}:")
-            print(f"  Resolvidos: {row['Resolvidos']}")
-            print(f"  Pendentes: {row['Pendentes']}")
-            print(f"  Em Análise: {row['Analise']}")
-            print(f"  Total: {row['Total']}")
+        columns = ['Responsavel', 'Resolvidos', 'Pendentes', 'Analise', 'Total']
+        for responsavel, resolvidos, pendentes, analise, total in results_df[columns].itertuples(index=False, name=None):
+            print(f"\n{responsavel}:")
+            print(f"  Resolvidos: {resolvidos}")
+            print(f"  Pendentes: {pendentes}")
+            print(f"  Em Análise: {analise}")
+            print(f"  Total: {total}")
     
     return results_df
 
@@ -462,32 +679,20 @@ def analyze_daily_by_team(dfs, date):
     
     results = {}
     for team_name, df in dfs.items():
-        # Identificar coluna de data (DATA ou RESOLUCAO)
-        date_col = 'DATA'
-        if 'RESOLUCAO' in df.columns:
-            date_col = 'RESOLUCAO'
-        
         # Filtrar dados pela data
-        df_date = df[pd.to_datetime(df[date_col]).dt.normalize() == date]
+        df_date = filter_by_date(df, date)
         
         if df_date.empty:
             print(f"\n{team_name}: Não há dados para esta data.")
             continue
         
-        # Contagem de status
-        status_counts = df_date['SITUACAO'].value_counts()
-        
-        # Identificar os status disponíveis
-        status_map = {
-            'RESOLVIDO': ['RESOLVIDO', 'QUITADO'],
-            'PENDENTE': ['PENDENTE', 'EM ANDAMENTO'],
-            'ANALISE': ['ANALISE', 'EM ANÁLISE']
-        }
+        # Contagem de status por balde
+        bucket_counts = df_date['SITUACAO'].map(STATUS_TO_BUCKET).value_counts()
         
         results[team_name] = {
-            'Resolvidos': sum(status_counts.get(s, 0) for s in status_map['RESOLVIDO']),
-            'Pendentes': sum(status_counts.get(s, 0) for s in status_map['PENDENTE']),
-            'Analise': sum(status_counts.get(s, 0) for s in status_map['ANALISE']),
+            'Resolvidos': bucket_counts.get('Resolvidos', 0),
+            'Pendentes': bucket_counts.get('Pendentes', 0),
+            'Analise': bucket_counts.get('Analise', 0),
             'Total': len(df_date)
         }
         
@@ -534,70 +739,35 @@ def create_consolidated_dataframe(dfs, date):
     Returns:
         DataFrame consolidado
     """
+    metrics = CONSOLIDATED_METRICS
+    
     all_data = []
     
     for team_name, df in dfs.items():
-        # Identificar coluna de data
-        date_col = 'DATA'
-        if 'RESOLUCAO' in df.columns:
-            date_col = 'RESOLUCAO'
-            
         # Identificar coluna de responsável
-        resp_col = None
-        for col in ['RESPONSAVEL', 'CONSULTOR', 'RESPONSÁVEL']:
-            if col in df.columns:
-                resp_col = col
-                break
+        resp_col = column_roles(df)["resp_col"]
                 
         if not resp_col:
             continue
             
         # Filtrar dados pela data
-        df_date = df[pd.to_datetime(df[date_col]).dt.normalize() == date]
+        df_date = filter_by_date(df, date)
         
         if df_date.empty:
             continue
             
         # Análise por responsável
-        for resp in df_date[resp_col].unique():
-            if pd.isna(resp):
-                continue
-                
-            df_resp = df_date[df_date[resp_col] == resp]
-            
-            # Contagem de status
-            status_counts = df_resp['SITUACAO'].value_counts()
-            
-            # Mapear diferentes status
-            status_map = {
-                'RESOLVIDO': ['RESOLVIDO'],
-                'PENDENTE': ['PENDENTE', 'EM ANDAMENTO'],
-                'ANALISE': ['ANALISE', 'EM ANÁLISE'],
-                'QUITADO': ['QUITADO'],
-                'APROVADO': ['APROVADO']
-            }
-            
-            # Contar ocorrências de cada status
-            metrics = {
-                'Resolvidos': sum(status_counts.get(s, 0) for s in status_map['RESOLVIDO']),
-                'Pendentes': sum(status_counts.get(s, 0) for s in status_map['PENDENTE']),
-                'Analisados': sum(status_counts.get(s, 0) for s in status_map['ANALISE']),
-                'Quitados': sum(status_counts.get(s, 0) for s in status_map['QUITADO']),
-                'Aprovados': sum(status_counts.get(s, 0) for s in status_map['APROVADO'])
-            }
-            
-            all_data.append({
-                'Data': date,
-                'Nome': resp,
-                'Equipe': team_name,
-                **metrics
-            })
+        counts = count_status_buckets(df_date, resp_col, CONSOLIDATED_STATUS_TO_BUCKET, metrics)
+        team_data = counts[metrics].rename_axis('Nome').reset_index()
+        team_data.insert(0, 'Data', date)
+        team_data.insert(2, 'Equipe', team_name)
+        all_data.append(team_data)
     
     if not all_data:
         return pd.DataFrame()
     
     # Criar DataFrame
-    df_consolidated = pd.DataFrame(all_data)
+    df_consolidated = pd.concat(all_data, ignore_index=True)
     
     # Converter data para datetime
     df_consolidated['Data'] = pd.to_datetime(df_consolidated['Data'])
@@ -620,51 +790,80 @@ def analyze_daily_metrics(file_path, dates):
         show_available_dates(dfs)
         print("\nRealizando análise para as datas solicitadas...")
         
-        # DataFrame para armazenar dados consolidados
-        all_data = []
+        # Gravar o CSV consolidado incrementalmente, sem manter todas as datas em memória;
+        # o arquivo temporário só substitui o CSV anterior quando todas as datas forem gravadas
+        output_file = os.path.join(os.path.dirname(file_path), 'metricas_colaboradores.csv')
+        tmp_file = f"{output_file}.tmp"
+        output = None
+        writer = None
+        completed = False
         
-        # Para cada data
-        for date in dates:
-            print(f"\n{'='*50}")
-            print(f"Análise para {date}")
-            print('='*50)
-            
-            # Análise por equipe
-            team_results = analyze_daily_by_team(dfs, date)
-            
-            # Análise por colaborador para cada equipe
-            for team_name, df in dfs.items():
-                print(f"\n{'-'*30}")
-                print(f"Detalhamento {team_name}")
-                print(f"{'-'*30}")
-                analyze_daily_by_collaborator(df, date)
-            
-            # Criar DataFrame consolidado para esta data
-            df_date = create_consolidated_dataframe(dfs, pd.to_datetime(date))
-            if not df_date.empty:
-                all_data.append(df_date)
-        
-        # Consolidar todos os dados
-        if all_data:
-            df_all = pd.concat(all_data, ignore_index=True)
-            
-            # Calcular métricas totais por colaborador
+        try:
+            # Para cada data
+            for date in dates:
+                print(f"\n{'='*50}")
+                print(f"Análise para {date}")
+                print('='*50)
+                
+                # Análise por equipe
+                team_results = analyze_daily_by_team(dfs, date)
+                
+                # Análise por colaborador para cada equipe
+                for team_name, df in dfs.items():
+                    print(f"\n{'-'*30}")
+                    print(f"Detalhamento {team_name}")
+                    print(f"{'-'*30}")
+                    analyze_daily_by_collaborator(df, date)
+                
+                # Criar DataFrame consolidado para esta data e gravá-lo
+                df_date = create_consolidated_dataframe(dfs, pd.to_datetime(date))
+                if not df_date.empty:
+                    if writer is None:
+                        output = open(tmp_file, 'wb')
+                        output.write(b'\xef\xbb\xbf')
+                        writer = pacsv.CSVWriter(output, METRICS_CSV_SCHEMA)
+                    table = csv_table(df_date.assign(Data=df_date['Data'].dt.date))
+                    writer.write_table(table.select(METRICS_CSV_SCHEMA.names).cast(METRICS_CSV_SCHEMA))
+            completed = True
+        finally:
+            if writer is not None:
+                writer.close()
+            if output is not None:
+                output.close()
+            if not completed:
+                # Falha no meio das datas: descartar o arquivo parcial e manter o CSV anterior intacto
+                Path(tmp_file).unlink(missing_ok=True)
+        
+        if writer is not None:
+            os.replace(tmp_file, output_file)
+        
+        # Consolidar todos os dados a partir do CSV gravado
+        if writer is not None:
+            # Calcular métricas totais por colaborador (agregação no Arrow)
             print("\nMétricas Totais por Colaborador:")
-            metrics = ['Resolvidos', 'Pendentes', 'Analisados', 'Quitados', 'Aprovados']
-            totals = df_all.groupby(['Nome', 'Equipe'])[metrics].sum().reset_index()
+            metrics = CONSOLIDATED_METRICS
+            df_all = pacsv.read_csv(
+                output_file,
+                convert_options=pacsv.ConvertOptions(
+                    column_types=METRICS_CSV_SCHEMA,
+                    include_columns=['Nome', 'Equipe'] + metrics
+                )
+            )
+            totals = df_all.group_by(['Nome', 'Equipe']).aggregate([(metric, 'sum') for metric in metrics])
+            totals = totals.rename_columns(
+                [name.removesuffix('_sum') for name in totals.column_names]
+            ).to_pandas()[['Nome', 'Equipe'] + metrics]
             
             # Ordenar por total de resolvidos
-            totals = totals.sort_values('Resolvidos', ascending=False)
+            totals = totals.sort_values(['Nome', 'Equipe'], ignore_index=True)
+            totals = totals.sort_values('Resolvidos', ascending=False, kind='stable')
             
-            for _, row in totals.iterrows():
-                print(f"\n{row['Nome']} ({row['Equipe']}):")
-                for metric in metrics:
-                    if row[metric] > 0:  # Só mostrar métricas com valores
-                        print(f"  {metric}: {row[metric]}")
+            for nome, equipe, *values in totals.itertuples(index=False, name=None):
+                print(f"\n{nome} ({equipe}):")
+                for metric, value in zip(metrics, values):
+                    if value > 0:  # Só mostrar métricas com valores
+                        print(f"  {metric}: {value}")
             
-            # Salvar DataFrame consolidado
-            output_file = os.path.join(os.path.dirname(file_path), 'metricas_colaboradores.csv')
-            df_all.to_csv(output_file, index=False, encoding='utf-8-sig')
             print(f"\nDados consolidados salvos em: {output_file}")
             
     except Exception as e:
@@ -1,15 +1,23 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 import plotly.express as px
 import plotly.graph_objects as go
 import os
 import gc
+import json
 import logging
+import re
+import shutil
 from datetime import datetime, timedelta
 from typing import Dict, Tuple, Optional
 import warnings
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 # Configurar logging
 logging.basicConfig(
@@ -25,6 +33,61 @@ warnings.filterwarnings('ignore', category=FutureWarning)
 # Configurações de memória para pandas
 pd.options.mode.chained_assignment = None
 
+# Padrões de situação e de tipo de atendimento, compilados uma única vez
+RE_RESOLVIDO = re.compile(r'RESOLVID|FINALIZADO|CONCLUÍDO')
+RE_ANALISE = re.compile(r'ANALIS|ANÁLISE')
+RE_QUITADO = re.compile(r'QUITAD')
+RE_APROVADO = re.compile(r'APROVAD')
+RE_PENDENTE = re.compile(r'PENDENT')
+RE_ATIVO = re.compile(r'ATIVO')
+RE_RECEPTIVO = re.compile(r'RECEPTIVO')
+
+# Bits de situação por linha; uma situação pode cair em mais de um grupo (ex.: "APROVADO E QUITADO")
+BIT_RESOLVIDO, BIT_ANALISE, BIT_QUITADO, BIT_APROVADO, BIT_PENDENTE, BIT_ATIVO, BIT_RECEPTIVO = (
+    np.int8(1 << i) for i in range(7)
+)
+SITUACAO_BITS = {
+    BIT_RESOLVIDO: RE_RESOLVIDO,
+    BIT_ANALISE: RE_ANALISE,
+    BIT_QUITADO: RE_QUITADO,
+    BIT_APROVADO: RE_APROVADO,
+    BIT_PENDENTE: RE_PENDENTE
+}
+ATIVO_RECEPTIVO_BITS = {BIT_ATIVO: RE_ATIVO, BIT_RECEPTIVO: RE_RECEPTIVO}
+
+# Cache em disco das planilhas já processadas (Parquet), indexado por mtime/tamanho do Excel
+CACHE_DIR = Path('docs/.cache')
+
+# Versão do processamento das planilhas; incrementar quando o formato em cache mudar
+CACHE_VERSION = 10
+
+# Colunas de data; a linha conta em todo dia que coincide com qualquer uma delas
+DATE_COLUMNS = ['DATA', 'RESOLUCAO', 'Data', 'DATA CONCLUSÃO', 'DATA INÍCIO']
+
+# Possíveis nomes da coluna de situação, em ordem de preferência
+SITUACAO_COLUMNS = ['SITUACAO', 'SITUAÇÃO', 'STATUS', 'ESTADO']
+
+# Coluna interna com a equipe normalizada (maiúsculas, sem espaços nas pontas) para o filtro por equipe
+TEAM_KEY_COLUMN = '_EQUIPE_KEY'
+
+# Colunas monetárias, armazenadas em centavos (Int64); dividir por 100 para exibir em reais
+MONEY_COLUMNS = ['VALOR']
+
+# Demais colunas numéricas, convertidas para float32
+NUMERIC_COLUMNS = ['PERCENTUAL']
+
+# Colunas lidas do Excel (nomes já em maiúsculas); além delas, qualquer coluna de equipe
+NEEDED_COLUMNS = {
+    *(col.upper() for col in DATE_COLUMNS), *SITUACAO_COLUMNS, 'ATIVO/RECEPTIVO',
+    *MONEY_COLUMNS, *NUMERIC_COLUMNS
+}
+
+# Dia (int64, dias desde 1970-01-01) no índice das contagens diárias
+DAY_COLUMN = '_DAY_I64'
+
+# Coluna interna com os bits de situação (int8) de cada linha
+STATUS_BITS_COLUMN = '_STATUS_BITS'
+
 # Configuração da página
 try:
     st.set_page_config(
@@ -113,106 +176,278 @@ def get_column_dtypes(sheet_name: str) -> Dict:
     
     return sheet_specific_dtypes.get(sheet_name, common_dtypes)
 
-def safe_convert_dates(df: pd.DataFrame) -> pd.DataFrame:
+def clean_numeric(series: pd.Series) -> pd.Series:
     """
-    Converte colunas de data com tratamento de erros.
+    Converte uma coluna para número, limpando caracteres não numéricos quando ela é texto.
     """
-    date_columns = ['DATA', 'RESOLUCAO', 'Data', 'DATA CONCLUSÃO', 'DATA INÍCIO']
+    # Colunas já numéricas não precisam de limpeza
+    if pd.api.types.is_numeric_dtype(series):
+        return series
     
-    for col in date_columns:
-        if col in df.columns:
-            try:
+    # Remove caracteres não numéricos (regex em C++ do pyarrow) e converte para float
+    cleaned = pc.replace_substring_regex(
+        pa.array(series.astype('string'), type=pa.string()), r'[^\d.\-]', ''
+    )
+    # set_axis mantém a ordem das linhas; passar index= ao construtor reindexaria por rótulo
+    return pd.to_numeric(cleaned.to_pandas().set_axis(series.index), errors='coerce')
+
+def to_cents(series: pd.Series) -> pd.Series:
+    """
+    Converte um valor monetário para centavos inteiros (Int64, aceita nulos), sem erro de arredondamento do float.
+    """
+    return (clean_numeric(series).astype('float64') * 100).round().astype('Int64')
+
+def apply_schema(df: pd.DataFrame, max_category_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Aplica os tipos finais de todas as colunas em uma única passada: datas, valores em centavos,
+    números (float32) e textos com poucos valores distintos como categoria. Colunas com tipos
+    misturados (ex.: números e textos) viram texto, para caberem no cache Parquet.
+    """
+    converted = {}
+    for col in df.columns:
+        try:
+            if col in DATE_COLUMNS:
                 # Tenta converter para datetime, mantendo valores NaN para erros
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-            except Exception as e:
-                logger.warning(f"Erro ao converter coluna {col} para datetime: {str(e)}")
+                converted[col] = pd.to_datetime(df[col], errors='coerce')
+            elif col in MONEY_COLUMNS:
+                converted[col] = to_cents(df[col])
+            elif col in NUMERIC_COLUMNS:
+                converted[col] = clean_numeric(df[col]).astype('float32')
+            elif df[col].dtype == 'object':
+                values = df[col]
+                if pd.api.types.infer_dtype(values, skipna=True).startswith('mixed'):
+                    values = converted[col] = values.astype('string')
+                
+                # Uma única codificação por coluna, em vez de nunique() seguido de astype
+                categorical = values.astype('category')
+                if len(categorical.cat.categories) / len(df) < max_category_ratio:
+                    converted[col] = categorical
+        except Exception as e:
+            logger.warning(f"Erro ao converter coluna {col}: {str(e)}")
+    
+    return df.assign(**converted)
+
+def workbook_stamp(excel_path: str) -> str:
+    """
+    Identifica a versão de um arquivo (Excel ou CSV) pela data de modificação e pelo tamanho.
+    """
+    return f"{os.path.getmtime(excel_path)}_{os.path.getsize(excel_path)}_v{CACHE_VERSION}"
+
+def load_cached_sheets(stamp: str) -> Optional[Dict]:
+    """
+    Lê as planilhas do cache Parquet, se existir um cache completo para esta versão do Excel.
+    """
+    manifest_path = CACHE_DIR / stamp / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+    
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        return {
+            sheet['name']: pd.read_parquet(CACHE_DIR / stamp / sheet['file'])
+            for sheet in manifest['sheets']
+        }
+    except Exception as e:
+        logger.warning(f"Erro ao ler cache de planilhas: {str(e)}")
+        return None
+
+def save_cached_sheets(stamp: str, dfs: Dict) -> None:
+    """
+    Grava as planilhas processadas em Parquet (zstd) e o manifesto do cache,
+    removendo os caches de versões anteriores do Excel.
+    """
+    cache_path = CACHE_DIR / stamp
+    try:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        
+        sheets = []
+        for i, (sheet_name, sheet_data) in enumerate(dfs.items()):
+            file_name = f"{i}.parquet"
+            sheet_data.to_parquet(cache_path / file_name, compression='zstd', compression_level=3)
+            sheets.append({'name': sheet_name, 'file': file_name})
+        
+        # O manifesto é gravado por último e marca o cache como completo
+        with open(cache_path / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump({'sheets': sheets}, f, ensure_ascii=False)
+        
+        # Manter apenas o cache da versão atual do Excel
+        for old_path in CACHE_DIR.iterdir():
+            if old_path.is_dir() and old_path != cache_path:
+                shutil.rmtree(old_path, ignore_errors=True)
+    except Exception as e:
+        # Planilha que não coube no Parquet: descartar o cache parcial (sem manifesto ele já seria ignorado)
+        logger.warning(f"Erro ao gravar cache de planilhas: {str(e)}")
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+def column_aliases(df: pd.DataFrame) -> Dict:
+    """
+    Identifica uma única vez as colunas de equipe, situação, ativo/receptivo e data, guardando-as em df.attrs.
+    """
+    if 'aliases' not in df.attrs:
+        data_col = DATE_COLUMNS[0]
+        df.attrs['aliases'] = {
+            'EQUIPE': next((col for col in df.columns if 'EQUIPE' in col.upper()), None),
+            'SITUACAO': get_situacao_column(df),
+            'ATIVO_RECEPTIVO': 'ATIVO/RECEPTIVO' if 'ATIVO/RECEPTIVO' in df.columns else None,
+            'DATE': (
+                data_col
+                if data_col in df.columns and pd.api.types.is_datetime64_any_dtype(df[data_col])
+                else None
+            ),
+            'DATES': [
+                col for col in DATE_COLUMNS
+                if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])
+            ]
+        }
+    return df.attrs['aliases']
+
+def add_team_key(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adiciona a equipe normalizada como categoria, calculada uma única vez na carga.
+    """
+    equipe_col = column_aliases(df)['EQUIPE']
+    if equipe_col:
+        # Equipe vazia vira '' para nunca coincidir com uma equipe selecionada
+        df[TEAM_KEY_COLUMN] = (
+            df[equipe_col].astype('string').str.upper().str.strip().fillna('').astype('category')
+        )
+    return df
+
+def cat_bits(series: pd.Series, patterns: Dict) -> np.ndarray:
+    """
+    Aplica os padrões apenas aos valores distintos (categorias), montando uma tabela de bits
+    por categoria, e propaga o resultado para as linhas em uma única indexação.
+    """
+    cat = series.astype('category')
+    cats = cat.cat.categories.astype(str).str.upper().str.strip()
+    table = np.zeros(len(cats) + 1, dtype=np.int8)
+    for bit, rx in patterns.items():
+        table[:-1] |= np.fromiter((bit if rx.search(c) else 0 for c in cats), dtype=np.int8, count=len(cats))
+    # A posição extra no fim (código -1, valores nulos) fica sem nenhum bit
+    return table[cat.cat.codes.to_numpy()]
+
+def add_status_bits(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adiciona os bits de situação e de ativo/receptivo de cada linha, calculados uma única vez na carga.
+    """
+    aliases = column_aliases(df)
+    if not aliases['SITUACAO']:
+        return df
     
+    bits = cat_bits(df[aliases['SITUACAO']], SITUACAO_BITS)
+    if aliases['ATIVO_RECEPTIVO']:
+        bits |= cat_bits(df[aliases['ATIVO_RECEPTIVO']], ATIVO_RECEPTIVO_BITS)
+    df[STATUS_BITS_COLUMN] = bits
     return df
 
-def safe_convert_numeric(df: pd.DataFrame) -> pd.DataFrame:
+def is_needed_column(col) -> bool:
+    """
+    Indica se a coluna é usada pelo dashboard; as demais nem são lidas do Excel.
+    """
+    name = str(col).strip().upper()
+    return 'EQUIPE' in name or name in NEEDED_COLUMNS
+
+def load_one_sheet(excel_path: str, sheet_name: str) -> pd.DataFrame:
     """
-    Converte colunas numéricas com tratamento de erros.
+    Lê e prepara uma planilha do arquivo Excel.
     """
-    numeric_columns = ['VALOR', 'PERCENTUAL']
+    # Obter tipos de dados específicos para a planilha
+    dtypes = get_column_dtypes(sheet_name)
     
-    for col in numeric_columns:
-        if col in df.columns:
+    # Carregar a planilha com os tipos de dados especificados (leitor calamine, em Rust)
+    sheet_data = pd.read_excel(
+        excel_path,
+        sheet_name=sheet_name,
+        dtype=dtypes,
+        usecols=is_needed_column,
+        engine="calamine"
+    )
+    
+    # Limpar e padronizar nomes de colunas
+    sheet_data.columns = sheet_data.columns.str.strip().str.upper()
+    
+    # Remover linhas totalmente vazias
+    sheet_data = sheet_data.dropna(how='all')
+    
+    # Converter datas, números e categorias com segurança, em uma única passada
+    sheet_data = apply_schema(sheet_data)
+    
+    # Equipe normalizada e situação por linha, calculadas uma única vez
+    sheet_data = add_team_key(sheet_data)
+    return add_status_bits(sheet_data)
+
+def read_workbook(excel_path: str) -> Dict:
+    """
+    Lê e prepara todas as planilhas do arquivo Excel, em paralelo.
+    """
+    with pd.ExcelFile(excel_path, engine="calamine") as xls:
+        sheet_names = xls.sheet_names
+    
+    # O parsing do calamine libera o GIL; cada thread abre sua própria leitura do arquivo
+    dfs = {}
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        futures = {
+            sheet_name: executor.submit(load_one_sheet, excel_path, sheet_name)
+            for sheet_name in sheet_names
+        }
+        
+        # Recolher na ordem das planilhas
+        for sheet_name, future in futures.items():
             try:
-                # Remove caracteres não numéricos e converte para float
-                df[col] = df[col].astype(str).str.replace('[^\d.-]', '', regex=True)
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except Exception as e:
-                logger.warning(f"Erro ao converter coluna {col} para numérico: {str(e)}")
+                dfs[sheet_name] = future.result()
+                logger.info(f"Planilha {sheet_name} carregada com sucesso")
+                
+            except Exception as sheet_error:
+                logger.error(f"Erro ao carregar planilha {sheet_name}: {str(sheet_error)} (sheet: {sheet_name})")
+                continue
     
-    return df
+    return dfs
 
-# Decorador para cache de dados
-@st.cache_data(ttl=3600)  # Cache por 1 hora
-def load_data() -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+# Objetos mantidos vivos em memória (sem pickle); compartilhados entre sessões
+@st.cache_resource(ttl=3600)  # Cache por 1 hora
+def load_data() -> Tuple[Optional[pd.DataFrame], Optional[Dict], Optional[str]]:
     """
     Carrega dados com tratamento de erros e gestão de memória.
+    Devolve também o carimbo do CSV e do Excel, usado como chave dos caches derivados dos dados.
     """
     try:
-        # Carregar CSV com chunks para economia de memória
-        csv_chunks = pd.read_csv(
-            'docs/metricas_colaboradores.csv',
-            chunksize=1000,
-            parse_dates=['Data']
+        # Carregar CSV com o leitor multithread do pyarrow (também descarta o BOM UTF-8)
+        csv_path = 'docs/metricas_colaboradores.csv'
+        table = pacsv.read_csv(
+            csv_path,
+            convert_options=pacsv.ConvertOptions(
+                column_types={'Data': pa.timestamp('ns')},
+                timestamp_parsers=[pacsv.ISO8601, '%d/%m/%Y']
+            )
         )
-        df = pd.concat(csv_chunks, ignore_index=True)
+        df = table.to_pandas()
         
         # Carregar Excel com verificação de memória
         excel_path = 'docs/_DEMANDAS DE JANEIRO_2025.xlsx'
         if not os.path.exists(excel_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {excel_path}")
             
-        dfs = {}
-        with pd.ExcelFile(excel_path) as xls:
-            for sheet_name in xls.sheet_names:
-                try:
-                    # Obter tipos de dados específicos para a planilha
-                    dtypes = get_column_dtypes(sheet_name)
-                    
-                    # Carregar a planilha com os tipos de dados especificados
-                    sheet_data = pd.read_excel(
-                        xls,
-                        sheet_name=sheet_name,
-                        dtype=dtypes
-                    )
-                    
-                    # Converter datas e números com segurança
-                    sheet_data = safe_convert_dates(sheet_data)
-                    sheet_data = safe_convert_numeric(sheet_data)
-                    
-                    # Limpar e padronizar nomes de colunas
-                    sheet_data.columns = sheet_data.columns.str.strip().str.upper()
-                    
-                    # Remover linhas totalmente vazias
-                    sheet_data = sheet_data.dropna(how='all')
-                    
-                    # Converter strings para categoria quando apropriado
-                    for col in sheet_data.select_dtypes(include=['object']):
-                        if sheet_data[col].nunique() / len(sheet_data) < 0.5:
-                            sheet_data[col] = sheet_data[col].astype('category')
-                    
-                    dfs[sheet_name] = sheet_data
-                    logger.info(f"Planilha {sheet_name} carregada com sucesso")
-                    
-                except Exception as sheet_error:
-                    logger.error(f"Erro ao carregar planilha {sheet_name}: {str(sheet_error)} (sheet: {sheet_name})")
-                    continue
-                finally:
-                    gc.collect()
+        # Reutilizar o cache Parquet quando o Excel não mudou desde a última leitura
+        stamp = workbook_stamp(excel_path)
+        dfs = load_cached_sheets(stamp)
+        if dfs is None:
+            dfs = read_workbook(excel_path)
+            if dfs:
+                save_cached_sheets(stamp, dfs)
+        else:
+            logger.info("Planilhas carregadas do cache Parquet")
         
         if not dfs:
             raise ValueError("Nenhuma planilha foi carregada com sucesso")
         
-        return df, dfs
+        return df, dfs, f"{workbook_stamp(csv_path)}|{stamp}"
         
     except Exception as e:
         logger.error(f"Erro ao carregar dados: {str(e)}")
         st.error(f"Erro ao carregar dados: {str(e)}")
-        return None, None
+        return None, None, None
     finally:
         gc.collect()
 
@@ -221,15 +456,9 @@ def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     Otimiza tipos de dados do DataFrame para reduzir uso de memória.
     """
     try:
+        # Textos, datas e floats já recebem o tipo final em apply_schema
         for col in df.columns:
-            if df[col].dtype == 'object':
-                # Converter strings para categoria se tiver poucos valores únicos
-                if df[col].nunique() / len(df) < 0.5:
-                    df[col] = df[col].astype('category')
-            elif df[col].dtype == 'float64':
-                # Reduzir precisão de floats quando possível
-                df[col] = df[col].astype('float32')
-            elif df[col].dtype == 'int64':
+            if df[col].dtype == 'int64':
                 # Reduzir precisão de ints quando possível
                 if df[col].min() >= -32768 and df[col].max() <= 32767:
                     df[col] = df[col].astype('int16')
@@ -244,16 +473,114 @@ def get_situacao_column(df: pd.DataFrame) -> Optional[str]:
     """
     Identifica a coluna correta de situação no DataFrame.
     """
-    possible_columns = ['SITUACAO', 'SITUAÇÃO', 'STATUS', 'ESTADO']
-    for col in possible_columns:
+    for col in SITUACAO_COLUMNS:
         if col in df.columns:
             return col
     return None
 
+# Marcações por linha somadas nas métricas diárias
+STATUS_FLAGS = [
+    'Resolvidos', 'Analise', 'Quitado', 'Aprovados',
+    'Pendente_Ativo', 'Pendente_Receptivo', 'Receptivo', 'Analise_Dia'
+]
+
+def to_days(series: pd.Series) -> np.ndarray:
+    """
+    Converte uma coluna de datas em dias desde 1970-01-01 (datetime64[D]); NaT continua NaT.
+    """
+    return series.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+
+def row_days(df: pd.DataFrame, date_cols: list) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retorna os pares distintos (linha, dia) das colunas de data: a linha conta em todo dia
+    que coincide com qualquer uma delas, uma única vez por dia.
+    """
+    days = np.concatenate([to_days(df[col]) for col in date_cols])
+    rows = np.tile(np.arange(len(df)), len(date_cols))
+    filled = ~np.isnat(days)
+    pairs = pd.DataFrame({'row': rows[filled], 'day': days[filled].astype('int64')}).drop_duplicates()
+    return pairs['row'].to_numpy(), pairs['day'].to_numpy()
+
+def build_status_frame(dfs: Dict) -> pd.DataFrame:
+    """
+    Reúne as planilhas em uma única tabela com um registro por (linha, dia), com a equipe e as marcações de situação.
+    """
+    frames = []
+    for sheet_name, df in dfs.items():
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
+        
+        # Bits de situação calculados na carga; planilhas sem coluna de situação não entram nas métricas
+        if STATUS_BITS_COLUMN not in df.columns:
+            continue
+        
+        aliases = column_aliases(df)
+        if not aliases['DATES']:
+            continue
+        
+        try:
+            bits = df[STATUS_BITS_COLUMN].to_numpy()
+            analise_mask = (bits & BIT_ANALISE) != 0
+            pendente_mask = (bits & BIT_PENDENTE) != 0
+            receptivo_mask = (bits & BIT_RECEPTIVO) != 0
+            
+            flags = {
+                'Resolvidos': (bits & BIT_RESOLVIDO) != 0,
+                'Analise': analise_mask,
+                'Quitado': (bits & BIT_QUITADO) != 0,
+                'Aprovados': (bits & BIT_APROVADO) != 0,
+                'Pendente_Ativo': pendente_mask & ((bits & BIT_ATIVO) != 0),
+                'Pendente_Receptivo': pendente_mask & receptivo_mask,
+                'Receptivo': receptivo_mask,
+                'Analise_Dia': np.zeros(len(df), dtype=bool)
+            }
+            
+            rows, days = row_days(df, aliases['DATES'])
+            day_flags = {flag: mask[rows] for flag, mask in flags.items()}
+            
+            # Análise do dia: em análise e com a coluna DATA no próprio dia
+            if aliases['DATE']:
+                data_days = to_days(df[aliases['DATE']])[rows]
+                day_flags['Analise_Dia'] = day_flags['Analise'] & (data_days.astype('int64') == days)
+            
+            # Equipe normalizada na carga; nula quando a planilha não tem coluna de equipe (não é filtrada)
+            equipe = df[TEAM_KEY_COLUMN].to_numpy()[rows] if TEAM_KEY_COLUMN in df.columns else None
+            
+            frames.append(pd.DataFrame({
+                DAY_COLUMN: days,
+                '_EQUIPE': equipe,
+                **{flag: mask.astype(np.int8) for flag, mask in day_flags.items()}
+            }))
+            
+        except Exception as e:
+            logger.error(f"Erro ao processar métricas da planilha {sheet_name}: {str(e)}")
+            continue
+    
+    if not frames:
+        return pd.DataFrame(columns=[DAY_COLUMN, '_EQUIPE'] + STATUS_FLAGS)
+    
+    status = pd.concat(frames, ignore_index=True)
+    status['_EQUIPE'] = status['_EQUIPE'].astype('category')
+    return status
+
+@st.cache_resource(ttl=3600)
+def build_facts(_dfs: Dict, data_key: str) -> pd.DataFrame:
+    """
+    Pré-calcula as contagens de cada marcação por (dia, equipe), para que as métricas de um dia sejam uma consulta.
+    `_dfs` não é usado na chave do cache; `data_key` (carimbo dos arquivos retornado por load_data) identifica os dados.
+    """
+    status = build_status_frame(_dfs)
+    if status.empty:
+        return pd.DataFrame(columns=STATUS_FLAGS, index=pd.MultiIndex.from_arrays([[], []], names=[DAY_COLUMN, '_EQUIPE']))
+    
+    # Equipe nula (planilha sem coluna de equipe) vira um grupo próprio
+    return status.groupby([DAY_COLUMN, '_EQUIPE'], observed=True, dropna=False)[STATUS_FLAGS].sum().sort_index()
+
 @st.cache_data(ttl=3600)
-def calculate_daily_metrics(dfs: Dict, date: datetime, selected_team: str = None) -> Dict:
+def calculate_daily_metrics(_dfs: Dict, data_key: str, date: datetime, selected_team: str = None) -> Dict:
     """
     Calcula métricas diárias com tratamento de erros.
+    O cache é indexado por `data_key`, data e equipe, sem hashear as planilhas a cada chamada.
     """
     metrics = {
         'Resolvidos': 0,
@@ -271,87 +598,22 @@ def calculate_daily_metrics(dfs: Dict, date: datetime, selected_team: str = None
     }
     
     try:
-        for sheet_name, df in dfs.items():
-            if not isinstance(df, pd.DataFrame) or df.empty:
-                continue
-            
-            logger.info(f"Processando planilha: {sheet_name}")
-            
-            # Processar em chunks para grandes DataFrames
-            chunk_size = 1000
-            for chunk_start in range(0, len(df), chunk_size):
-                chunk_end = min(chunk_start + chunk_size, len(df))
-                df_chunk = df.iloc[chunk_start:chunk_end].copy()
-                
-                # Filtrar por equipe se selecionada
-                if selected_team:
-                    equipe_col = next((col for col in df_chunk.columns if 'EQUIPE' in col.upper()), None)
-                    if equipe_col and not df_chunk[equipe_col].empty:
-                        df_chunk = df_chunk[df_chunk[equipe_col].astype(str).str.upper() == selected_team.upper()]
-                
-                # Identificar coluna de situação
-                situacao_col = get_situacao_column(df_chunk)
-                
-                # Filtrar por data usando as colunas disponíveis
-                date_mask = pd.Series(False, index=df_chunk.index)
-                date_columns = ['DATA', 'RESOLUCAO', 'Data', 'DATA CONCLUSÃO', 'DATA INÍCIO']
-                
-                for date_col in date_columns:
-                    if date_col in df_chunk.columns and not df_chunk[date_col].empty:
-                        if pd.api.types.is_datetime64_any_dtype(df_chunk[date_col]):
-                            date_mask |= (df_chunk[date_col].dt.date == date.date())
-                
-                df_date = df_chunk[date_mask]
-                
-                if df_date.empty:
-                    continue
-                
-                # Calcular métricas
-                if situacao_col:
-                    try:
-                        # Converter situação para uppercase e remover espaços extras
-                        situacao_series = df_date[situacao_col].astype(str).str.upper().str.strip()
-                        
-                        # Contagem de resolvidos
-                        resolvido_mask = situacao_series.str.contains('RESOLVID|FINALIZADO|CONCLUÍDO', na=False)
-                        metrics['Resolvidos'] += resolvido_mask.sum()
-                        
-                        # Contagem de análise
-                        analise_mask = situacao_series.str.contains('ANALIS|ANÁLISE', na=False)
-                        metrics['Analise'] += analise_mask.sum()
-                        
-                        # Contagem de quitados
-                        quitado_mask = situacao_series.str.contains('QUITAD', na=False)
-                        metrics['Quitado'] += quitado_mask.sum()
-                        
-                        # Contagem de aprovados
-                        aprovado_mask = situacao_series.str.contains('APROVAD', na=False)
-                        metrics['Aprovados'] += aprovado_mask.sum()
-                        
-                        # Contagem de pendentes
-                        pendente_mask = situacao_series.str.contains('PENDENT', na=False)
-                        
-                        if 'ATIVO/RECEPTIVO' in df_date.columns:
-                            ativo_mask = df_date['ATIVO/RECEPTIVO'].astype(str).str.upper().str.contains('ATIVO', na=False)
-                            receptivo_mask = df_date['ATIVO/RECEPTIVO'].astype(str).str.upper().str.contains('RECEPTIVO', na=False)
-                            
-                            metrics['Pendente_Ativo'] += (pendente_mask & ativo_mask).sum()
-                            metrics['Pendente_Receptivo'] += (pendente_mask & receptivo_mask).sum()
-                            metrics['Receptivo'] += receptivo_mask.sum()
-                        
-                        # Análise do dia
-                        if analise_mask.any():
-                            metrics['Analise_Dia'] += len(df_date[
-                                analise_mask & (df_date[date_columns[0]].dt.date == date.date())
-                            ])
-                        
-                    except Exception as e:
-                        logger.error(f"Erro ao processar métricas da planilha {sheet_name}: {str(e)}")
-                        continue
-                
-                # Limpar memória
-                del df_chunk, df_date
-                gc.collect()
+        facts = build_facts(_dfs, data_key)
+        
+        # Contagens do dia, uma linha por equipe
+        target = np.datetime64(pd.Timestamp(date).date(), 'D').astype('int64')
+        if target not in facts.index.get_level_values(DAY_COLUMN):
+            return metrics
+        day_facts = facts.loc[target]
+        
+        # Filtrar por equipe se selecionada (planilhas sem coluna de equipe não são filtradas)
+        if selected_team:
+            equipe = day_facts.index
+            day_facts = day_facts[equipe.isna() | (equipe == selected_team.upper().strip())]
+        
+        totals = day_facts.sum()
+        for flag in STATUS_FLAGS:
+            metrics[flag] = int(totals[flag])
         
         logger.info("Métricas calculadas com sucesso")
         return metrics
@@ -361,6 +623,40 @@ def calculate_daily_metrics(dfs: Dict, date: datetime, selected_team: str = None
         st.error(f"Erro ao calcular métricas: {str(e)}")
         return metrics
 
+# Métricas por colaborador exibidas na tabela de detalhamento
+PERSON_METRICS = ['Resolvidos', 'Pendentes']
+
+@st.cache_resource(ttl=3600)
+def build_person_table(_df: pd.DataFrame, data_key: str) -> pd.DataFrame:
+    """
+    Soma as métricas por (dia, equipe, colaborador) uma única vez, para que a tabela de detalhamento seja uma consulta.
+    `_df` não é usado na chave do cache; `data_key` (carimbo dos arquivos retornado por load_data) identifica os dados.
+    """
+    return _df.groupby(
+        [_df['Data'].dt.normalize(), 'Equipe', 'Nome']
+    )[PERSON_METRICS].sum().sort_index()
+
+@st.cache_data(ttl=600)
+def build_team_fig(team: str, values: Tuple[int, int, int]) -> str:
+    """
+    Monta o gráfico de métricas da equipe e devolve o JSON do Plotly, reaproveitado enquanto as entradas não mudam.
+    """
+    fig_team = go.Figure()
+    
+    # Adicionar barras para a equipe selecionada
+    fig_team.add_trace(go.Bar(
+        name=team,
+        x=['Resolvidos', 'Pendentes', 'Análise'],
+        y=list(values)
+    ))
+    
+    fig_team.update_layout(
+        title=f'Métricas da Equipe {team}',
+        barmode='group',
+        height=500
+    )
+    return fig_team.to_json()
+
 def main():
     try:
         # Título principal
@@ -368,7 +664,7 @@ def main():
         
         # Carregar dados
         with st.spinner('Carregando dados...'):
-            df, dfs = load_data()
+            df, dfs, data_key = load_data()
             
         if df is None or dfs is None:
             st.error("Não foi possível carregar os dados. Verifique os logs para mais detalhes.")
@@ -402,7 +698,7 @@ def main():
         
         # Calcular métricas
         with st.spinner('Calculando métricas...'):
-            daily_metrics = calculate_daily_metrics(dfs, selected_datetime, selected_team)
+            daily_metrics = calculate_daily_metrics(dfs, data_key, selected_datetime, selected_team)
         
         # Layout em grid para métricas principais
         col1, col2, col3 = st.columns(3)
@@ -428,33 +724,17 @@ def main():
         # Gráficos
         st.header(f"📈 Análise Gráfica - Equipe {selected_team}")
         
-        # Filtrar dados para a data selecionada e equipe
-        df_day = df[
-            (df['Data'].dt.date == selected_date) &
-            (df['Equipe'] == selected_team)
-        ]
-        
         # Gráfico de barras - Métricas por Equipe
         try:
-            fig_team = go.Figure()
-            
-            # Adicionar barras para a equipe selecionada
-            fig_team.add_trace(go.Bar(
-                name=selected_team,
-                x=['Resolvidos', 'Pendentes', 'Análise'],
-                y=[
+            fig_team = build_team_fig(
+                selected_team,
+                (
                     daily_metrics['Resolvidos'],
                     daily_metrics['Pendente_Ativo'] + daily_metrics['Pendente_Receptivo'],
                     daily_metrics['Analise']
-                ]
-            ))
-            
-            fig_team.update_layout(
-                title=f'Métricas da Equipe {selected_team}',
-                barmode='group',
-                height=500
+                )
             )
-            st.plotly_chart(fig_team, use_container_width=True)
+            st.plotly_chart(json.loads(fig_team), use_container_width=True)
         except Exception as e:
             logger.error(f"Erro ao criar gráfico: {str(e)}")
             st.error("Erro ao criar gráfico de métricas por equipe")
@@ -463,15 +743,23 @@ def main():
         st.header(f"📋 Detalhamento - Equipe {selected_team}")
         
         try:
-            detailed_df = df_day.groupby(['Nome']).agg({
-                'Resolvidos': 'sum',
-                'Pendentes': 'sum'
-            }).reset_index()
+            # Totais por colaborador já agregados por (dia, equipe) na carga
+            person_table = build_person_table(df, data_key)
+            try:
+                detailed_df = person_table.xs(
+                    (pd.Timestamp(selected_date), selected_team), level=['Data', 'Equipe']
+                ).reset_index()
+            except KeyError:
+                detailed_df = pd.DataFrame(columns=['Nome'] + PERSON_METRICS)
             
             detailed_df = detailed_df.sort_values('Resolvidos', ascending=False)
+            # Formatação feita no navegador, sem montar o HTML do Styler a cada execução
             st.dataframe(
-                detailed_df.style.highlight_max(subset=['Resolvidos', 'Pendentes'], color='lightgreen'),
-                use_container_width=True
+                detailed_df,
+                use_container_width=True,
+                column_config={
+                    metric: st.column_config.NumberColumn(format="%d") for metric in PERSON_METRICS
+                }
             )
         except Exception as e:
             logger.error(f"Erro ao criar tabela detalhada: {str(e)}")
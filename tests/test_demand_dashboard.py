@@ -0,0 +1,88 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Adiciona o diretório de scripts ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+pytest.importorskip('streamlit')
+import demand_dashboard
+
+def test_clean_numeric_non_contiguous_index():
+    # Índice com lacunas, como após dropna(how='all')
+    series = pd.Series(['R$ 10', None, 'R$ 30', 'R$ 40'], index=[0, 2, 3, 5])
+
+    result = demand_dashboard.clean_numeric(series)
+
+    # Cada valor continua na sua própria linha
+    assert list(result.index) == [0, 2, 3, 5]
+    assert result.loc[0] == 10
+    assert pd.isna(result.loc[2])
+    assert result.loc[3] == 30
+    assert result.loc[5] == 40
+
+def test_to_cents_non_contiguous_index():
+    series = pd.Series(['R$ 12.50', '7.25', None], index=[3, 7, 8])
+
+    result = demand_dashboard.to_cents(series)
+
+    assert list(result.index) == [3, 7, 8]
+    assert result.loc[3] == 1250
+    assert result.loc[7] == 725
+    assert pd.isna(result.loc[8])
+
+def prepare_sheet(df):
+    # Mesmos passos de load_one_sheet, a partir de um DataFrame em memória
+    df = demand_dashboard.apply_schema(df)
+    df = demand_dashboard.add_team_key(df)
+    return demand_dashboard.add_status_bits(df)
+
+def row_mask_metrics(sheets, date, selected_team):
+    # Referência: máscaras por linha, contando a linha em todo dia que coincide com qualquer coluna de data
+    metrics = dict.fromkeys(demand_dashboard.STATUS_FLAGS, 0)
+    for df in sheets:
+        date_mask = pd.Series(False, index=df.index)
+        for col in ['DATA', 'RESOLUCAO']:
+            if col in df.columns:
+                date_mask |= df[col].dt.date == date.date()
+        df = df[date_mask]
+        if selected_team and 'EQUIPE' in df.columns:
+            df = df[df['EQUIPE'].str.upper().str.strip() == selected_team]
+
+        situacao = df['SITUACAO'].fillna('').str.upper()
+        tipo = df['ATIVO/RECEPTIVO'].fillna('').str.upper()
+        pendente = situacao.str.contains('PENDENT')
+        analise = situacao.str.contains('ANALIS|ANÁLISE')
+        metrics['Resolvidos'] += situacao.str.contains('RESOLVID|FINALIZADO|CONCLUÍDO').sum()
+        metrics['Analise'] += analise.sum()
+        metrics['Quitado'] += situacao.str.contains('QUITAD').sum()
+        metrics['Aprovados'] += situacao.str.contains('APROVAD').sum()
+        metrics['Pendente_Ativo'] += (pendente & tipo.str.contains('ATIVO')).sum()
+        metrics['Pendente_Receptivo'] += (pendente & tipo.str.contains('RECEPTIVO')).sum()
+        metrics['Receptivo'] += tipo.str.contains('RECEPTIVO').sum()
+        metrics['Analise_Dia'] += (analise & (df['DATA'].dt.date == date.date())).sum()
+    return metrics
+
+def test_daily_metrics_match_row_masks():
+    day = pd.Timestamp
+    with_team = pd.DataFrame({
+        'DATA': [day('2025-01-02'), day('2025-01-02'), day('2025-01-03'), pd.NaT, day('2025-01-02'), day('2025-01-03')],
+        'RESOLUCAO': [day('2025-01-03'), day('2025-01-02'), pd.NaT, day('2025-01-03'), day('2025-01-04'), day('2025-01-03')],
+        'SITUACAO': ['RESOLVIDO', 'EM ANÁLISE', 'PENDENTE', 'APROVADO E QUITADO', None, 'Finalizado'],
+        'ATIVO/RECEPTIVO': ['RECEPTIVO', 'ATIVO', 'ATIVO', None, 'RECEPTIVO', 'RECEPTIVO'],
+        'EQUIPE': ['JULIO', 'Leandro/Adriano ', 'JULIO', 'JULIO', 'JULIO', 'Leandro/Adriano '],
+    })
+    without_team = pd.DataFrame({
+        'DATA': [day('2025-01-02'), day('2025-01-03'), day('2025-01-03')],
+        'SITUACAO': ['PENDENTE', 'ANALISE', 'QUITADO'],
+        'ATIVO/RECEPTIVO': ['RECEPTIVO', 'ATIVO', 'RECEPTIVO'],
+    })
+    dfs = {'A': prepare_sheet(with_team), 'B': prepare_sheet(without_team)}
+
+    for date in pd.date_range('2025-01-01', '2025-01-05'):
+        for team in [None, 'JULIO', 'LEANDRO/ADRIANO']:
+            metrics = demand_dashboard.calculate_daily_metrics(dfs, 'test_row_masks', date, team)
+            expected = row_mask_metrics([with_team, without_team], date, team)
+            for flag in demand_dashboard.STATUS_FLAGS:
+                assert metrics[flag] == expected[flag], (date, team, flag)